@@ -10,11 +10,21 @@ Linux / other Unix tries the freedesktop.org Trash spec.
 
 import ctypes
 import datetime as _dt
+import errno
+import functools
 import os
 import shutil
+import stat
 import sys
+import threading
+import traceback
 import urllib.parse
+import uuid
 from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, QRunnable, Qt, QThreadPool, pyqtSignal
+from PyQt6.QtWidgets import QCheckBox, QMessageBox
 
 from picard.plugin3.api import BaseAction, PluginApi
 
@@ -23,17 +33,9 @@ CONFIRM_TRASH_SETTING_KEY = "confirm_trash"
 
 
 def _confirm_send_to_trash(api: PluginApi, parent, count: int) -> bool:
-    api.plugin_config.register_option(CONFIRM_TRASH_SETTING_KEY, True)
+    # The option itself is registered once in enable().
     if not api.plugin_config[CONFIRM_TRASH_SETTING_KEY]:
         return True
-    try:
-        import importlib
-
-        qtwidgets = importlib.import_module("PyQt6.QtWidgets")
-        QCheckBox = qtwidgets.QCheckBox
-        QMessageBox = qtwidgets.QMessageBox
-    except Exception:
-        return True
 
     box = QMessageBox(parent)
     box.setIcon(QMessageBox.Icon.Warning)
@@ -68,24 +70,225 @@ class _WinSHFILEOPSTRUCTW(ctypes.Structure):
     ]
 
 
-def _trash_windows(paths):
+class _WinGUID(ctypes.Structure):
+    _fields_ = [
+        ("Data1", ctypes.c_uint32),
+        ("Data2", ctypes.c_uint16),
+        ("Data3", ctypes.c_uint16),
+        ("Data4", ctypes.c_ubyte * 8),
+    ]
+
+    @classmethod
+    def from_string(cls, text):
+        return cls.from_buffer_copy(uuid.UUID(text).bytes_le)
+
+
+_CLSID_FILE_OPERATION = _WinGUID.from_string("3ad05575-8857-4850-9277-11b85bdb8e09")
+_IID_IFILE_OPERATION = _WinGUID.from_string("947aab5f-0a5c-4c13-b4d6-4bf7836fc9f8")
+_IID_ISHELL_ITEM = _WinGUID.from_string("43826d1e-e718-42ee-bc55-a1e261c37bfe")
+_IID_IUNKNOWN = _WinGUID.from_string("00000000-0000-0000-c000-000000000046")
+_IID_IFILE_OPERATION_PROGRESS_SINK = _WinGUID.from_string(
+    "04b0f1a7-9490-44bc-96e1-4296a31252e2"
+)
+
+# Success codes the copy engine reports for items it skipped.
+_WIN_SKIPPED_HRESULTS = (
+    0x00270003,  # COPYENGINE_S_NOT_HANDLED
+    0x00270005,  # COPYENGINE_S_USER_IGNORED
+)
+
+# Paths per IFileOperation.PerformOperations() call; large enough to amortize
+# the shell round trip without holding thousands of IShellItems at once.
+_WIN_BATCH_SIZE = 200
+
+
+def _win_com_method(obj, index, *argtypes):
+    """Bind vtable slot `index` of the COM interface pointer `obj`."""
+
+    vtbl = ctypes.cast(obj, ctypes.POINTER(ctypes.POINTER(ctypes.c_void_p))).contents
+    proto = ctypes.WINFUNCTYPE(ctypes.c_long, ctypes.c_void_p, *argtypes)
+    method = proto(vtbl[index])
+    return lambda *args: method(obj, *args)
+
+
+def _win_com_release(obj):
+    if obj:
+        _win_com_method(obj, 2)()
+
+
+class _WinDeleteSink(ctypes.Structure):
+    """Per-item IFileOperationProgressSink that records PostDeleteItem's HRESULT."""
+
+    _fields_ = [
+        ("lpVtbl", ctypes.c_void_p),
+        ("done", ctypes.c_int),
+        ("hr", ctypes.c_long),
+    ]
+
+
+# Built on first use (WINFUNCTYPE only exists on Windows) and kept alive for
+# the life of the process, since the shell calls back into these thunks.
+_WIN_DELETE_SINK_VTBL = None
+
+
+def _win_delete_sink_vtbl():
+    global _WIN_DELETE_SINK_VTBL
+    if _WIN_DELETE_SINK_VTBL is not None:
+        return _WIN_DELETE_SINK_VTBL
+
+    E_NOINTERFACE = ctypes.c_long(0x80004002).value
+    accepted_iids = (bytes(_IID_IUNKNOWN), bytes(_IID_IFILE_OPERATION_PROGRESS_SINK))
+
+    @ctypes.WINFUNCTYPE(
+        ctypes.c_long, ctypes.c_void_p, ctypes.POINTER(_WinGUID), ctypes.POINTER(ctypes.c_void_p)
+    )
+    def query_interface(this, riid, ppv):
+        if bytes(riid.contents) in accepted_iids:
+            ppv[0] = this
+            return 0
+        ppv[0] = None
+        return E_NOINTERFACE
+
+    # The sinks are owned by Python, so reference counting is a no-op.
+    @ctypes.WINFUNCTYPE(ctypes.c_ulong, ctypes.c_void_p)
+    def add_ref_release(this):
+        return 1
+
+    @ctypes.WINFUNCTYPE(
+        ctypes.c_long, ctypes.c_void_p, ctypes.c_ulong, ctypes.c_void_p, ctypes.c_long, ctypes.c_void_p
+    )
+    def post_delete_item(this, flags, item, hr_delete, new_item):
+        sink = ctypes.cast(this, ctypes.POINTER(_WinDeleteSink)).contents
+        sink.done = 1
+        sink.hr = hr_delete
+        return 0
+
+    def noop(argc):
+        proto = ctypes.WINFUNCTYPE(ctypes.c_long, ctypes.c_void_p, *([ctypes.c_void_p] * argc))
+        return proto(lambda this, *args: 0)
+
+    # IFileOperationProgressSink slots after IUnknown, in vtable order; the
+    # no-op thunks only need the right argument count for stdcall.
+    methods = [
+        query_interface,
+        add_ref_release,
+        add_ref_release,
+        noop(0),  # StartOperations
+        noop(1),  # FinishOperations
+        noop(3),  # PreRenameItem
+        noop(5),  # PostRenameItem
+        noop(4),  # PreMoveItem
+        noop(6),  # PostMoveItem
+        noop(4),  # PreCopyItem
+        noop(6),  # PostCopyItem
+        noop(2),  # PreDeleteItem
+        post_delete_item,
+        noop(3),  # PreNewItem
+        noop(7),  # PostNewItem
+        noop(2),  # UpdateProgress
+        noop(0),  # ResetTimer
+        noop(0),  # PauseTimer
+        noop(0),  # ResumeTimer
+    ]
+    vtbl = (ctypes.c_void_p * len(methods))(
+        *(ctypes.cast(m, ctypes.c_void_p).value for m in methods)
+    )
+    _WIN_DELETE_SINK_VTBL = (vtbl, methods)
+    return _WIN_DELETE_SINK_VTBL
+
+
+def _trash_windows_fileop_batch(ole32, shell32, paths):
+    """Recycle `paths` with a single IFileOperation.PerformOperations() call.
+
+    Raises OSError if the FileOperation object can't be set up; nothing has
+    been touched on disk in that case, so the caller can fall back.
+    """
+
+    CLSCTX_ALL = 0x17
+    FOF_ALLOWUNDO = 0x0040
+    FOF_NO_UI = 0x0614
+    FOFX_RECYCLEONDELETE = 0x00080000
+
+    op = ctypes.c_void_p()
+    hr = ole32.CoCreateInstance(
+        ctypes.byref(_CLSID_FILE_OPERATION),
+        None,
+        CLSCTX_ALL,
+        ctypes.byref(_IID_IFILE_OPERATION),
+        ctypes.byref(op),
+    )
+    if hr < 0:
+        raise OSError(f"CoCreateInstance(FileOperation) failed: {hr & 0xFFFFFFFF:#010x}")
+    try:
+        hr = _win_com_method(op, 5, ctypes.c_ulong)(
+            FOF_ALLOWUNDO | FOFX_RECYCLEONDELETE | FOF_NO_UI
+        )
+        if hr < 0:
+            raise OSError(f"IFileOperation.SetOperationFlags failed: {hr & 0xFFFFFFFF:#010x}")
+
+        vtbl, _methods = _win_delete_sink_vtbl()
+        vtbl_addr = ctypes.addressof(vtbl)
+        delete_item = _win_com_method(op, 18, ctypes.c_void_p, ctypes.c_void_p)
+        queued, failed = [], []
+        for p in paths:
+            # Missing or unparseable paths fail here; no separate exists() probe.
+            item = ctypes.c_void_p()
+            hr = shell32.SHCreateItemFromParsingName(
+                p, None, ctypes.byref(_IID_ISHELL_ITEM), ctypes.byref(item)
+            )
+            if hr < 0:
+                failed.append(p)
+                continue
+            sink = _WinDeleteSink(vtbl_addr, 0, 0)
+            try:
+                hr = delete_item(item, ctypes.addressof(sink))
+            finally:
+                _win_com_release(item)
+            if hr < 0:
+                failed.append(p)
+            else:
+                queued.append((p, sink))
+
+        if not queued:
+            return [], failed
+        # A failing item doesn't stop the rest, so the overall HRESULT says
+        # little; each sink knows whether its own item made it.
+        _win_com_method(op, 21)()
+        ok = []
+        for p, sink in queued:
+            if sink.done and sink.hr >= 0 and sink.hr not in _WIN_SKIPPED_HRESULTS:
+                ok.append(p)
+            else:
+                failed.append(p)
+        return ok, failed
+    finally:
+        _win_com_release(op)
+
+
+def _trash_windows_shfileop_call(paths):
     FO_DELETE = 0x0003
     FOF_ALLOWUNDO = 0x0040
     FOF_NOCONFIRMATION = 0x0010
     FOF_SILENT = 0x0004
     FOF_NOERRORUI = 0x0400
 
-    existing = [p for p in paths if p and os.path.exists(p)]
-    if not existing:
-        return [], paths
-
-    # Double-null terminated list of files
-    from_buf = "\0".join(existing) + "\0\0"
+    # Double-null terminated list of files, copied straight into one zeroed
+    # wchar buffer. Sizes come from the UTF-16 encoding because characters
+    # outside the BMP take two wchar units.
+    encoded = [p.encode("utf-16-le") for p in paths]
+    wchar_size = ctypes.sizeof(ctypes.c_wchar)
+    from_buf = ctypes.create_unicode_buffer(
+        sum(len(e) // wchar_size + 1 for e in encoded) + 1
+    )
+    addr = ctypes.addressof(from_buf)
+    for e in encoded:
+        ctypes.memmove(addr, e, len(e))
+        addr += len(e) + wchar_size
     flags = FOF_ALLOWUNDO | FOF_NOCONFIRMATION | FOF_SILENT | FOF_NOERRORUI
     op = _WinSHFILEOPSTRUCTW(
         None,
         FO_DELETE,
-        from_buf,
+        ctypes.cast(from_buf, ctypes.c_wchar_p),
         None,
         flags,
         0,
@@ -93,86 +296,379 @@ def _trash_windows(paths):
         None,
     )
 
+    # SHFileOperationW only reports on the batch as a whole.
     ret = ctypes.windll.shell32.SHFileOperationW(ctypes.byref(op))
     if ret != 0 or op.fAnyOperationsAborted:
-        return [], existing
-    return existing, []
+        return [], paths
+    return paths, []
+
+
+def _trash_windows_shfileop(paths):
+    """SHFileOperationW fallback that localizes failures by bisection.
+
+    A single bad path fails the whole call, so a failed batch is split in half
+    and retried: k bad paths cost O(k log n) shell calls rather than one per
+    file, and the good paths still get trashed.
+    """
+
+    ok, failed = _trash_windows_shfileop_call(paths)
+    if not failed or len(paths) == 1:
+        return ok, failed
+    mid = len(paths) // 2
+    ok_head, failed_head = _trash_windows_shfileop(paths[:mid])
+    ok_tail, failed_tail = _trash_windows_shfileop(paths[mid:])
+    return ok_head + ok_tail, failed_head + failed_tail
+
+
+def _trash_windows(paths, home_dir=None, now=None):
+    # home_dir / now are unused; all backends share one signature so the
+    # dispatcher can call whichever one was bound at import.
+    COINIT_APARTMENTTHREADED = 0x2
+    RPC_E_CHANGED_MODE = ctypes.c_long(0x80010106).value
+
+    ole32 = ctypes.windll.ole32
+    shell32 = ctypes.windll.shell32
+    hr = ole32.CoInitializeEx(None, COINIT_APARTMENTTHREADED)
+    if hr < 0 and hr != RPC_E_CHANGED_MODE:
+        # No COM on this thread: use the legacy single-call shell API.
+        return _trash_windows_shfileop(paths)
+
+    ok, failed = [], []
+    try:
+        for start in range(0, len(paths), _WIN_BATCH_SIZE):
+            batch = paths[start : start + _WIN_BATCH_SIZE]
+            try:
+                batch_ok, batch_failed = _trash_windows_fileop_batch(ole32, shell32, batch)
+            except OSError:
+                batch_ok, batch_failed = _trash_windows_shfileop(batch)
+            ok.extend(batch_ok)
+            failed.extend(batch_failed)
+    finally:
+        # RPC_E_CHANGED_MODE means COM was already initialized by someone
+        # else; only balance our own successful CoInitializeEx.
+        if hr >= 0:
+            ole32.CoUninitialize()
+    return ok, failed
+
+
+def _existing_names(dest_dir):
+    with os.scandir(dest_dir) as entries:
+        return {entry.name for entry in entries}
+
+
+class _TakenNames:
+    """Names known to be in use in a trash directory, shared by one call.
+
+    Most trashed names aren't in the trash yet, so the O(trash size) scan is
+    deferred until the first collision; `scan` returns the names then in use.
+    """
 
+    def __init__(self, scan):
+        self._scan = scan
+        self._names = None
+        self._lock = threading.Lock()
+
+    def claim(self, name):
+        """Return False if `name` is known to be taken, else mark it taken."""
+        with self._lock:
+            if self._names is None:
+                return True
+            if name in self._names:
+                return False
+            self._names.add(name)
+            return True
+
+    def collided(self, name):
+        """Record that `name` turned out to be taken, scanning on first use."""
+        with self._lock:
+            if self._names is None:
+                try:
+                    self._names = self._scan()
+                except OSError:
+                    # e.g. macOS won't list ~/.Trash without Full Disk Access;
+                    # fall back to probing each candidate with O_EXCL.
+                    self._names = set()
+            self._names.add(name)
+
+
+def _unique_dest_path(dest_dir, base_name, taken):
+    """Claim a free name for `base_name` in `dest_dir` and return its path.
+
+    Tries `base_name`, then `root.1.ext`, `root.2.ext`, ..., skipping names
+    `taken` (a `_TakenNames`) knows are in use. The name is reserved by
+    creating an empty placeholder with O_EXCL, which stays authoritative if
+    `taken` is stale; callers move the real file over the placeholder (see
+    `_discard_placeholder` for the failure path).
+    """
 
-def _unique_dest_path(dest_dir, base_name):
-    candidate = os.path.join(dest_dir, base_name)
-    if not os.path.exists(candidate):
-        return candidate
+    flags = os.O_CREAT | os.O_EXCL | os.O_WRONLY
+    dest_prefix = dest_dir + os.sep
+    candidate_name = base_name
     root, ext = os.path.splitext(base_name)
-    for i in range(1, 10_000):
-        candidate = os.path.join(dest_dir, f"{root}.{i}{ext}")
-        if not os.path.exists(candidate):
-            return candidate
+    for i in range(1, 10_001):
+        if taken.claim(candidate_name):
+            candidate = dest_prefix + candidate_name
+            try:
+                fd = os.open(candidate, flags, 0o600)
+            except FileExistsError:
+                taken.collided(candidate_name)
+            else:
+                os.close(fd)
+                return candidate
+        candidate_name = f"{root}.{i}{ext}"
     raise RuntimeError("Unable to find free destination name")
 
 
-def _trash_macos(paths, home_dir=None):
+def _discard_placeholder(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+_TRASH_DIR_LAYOUTS = {
+    "macos": ((".Trash",),),
+    "freedesktop": (
+        (".local", "share", "Trash", "files"),
+        (".local", "share", "Trash", "info"),
+    ),
+}
+
+
+@functools.lru_cache(maxsize=4)
+def _ensured_trash_dirs(home_dir, kind):
+    """Return the trash directories for `kind`, creating them on first use.
+
+    Cached so repeated calls skip the makedirs() stat/mkdir walk. The cache
+    can go stale if the trash is removed later; see `_with_trash_dirs`.
+    """
+
     home_dir = home_dir or os.path.expanduser("~")
-    trash_dir = os.path.join(home_dir, ".Trash")
-    os.makedirs(trash_dir, exist_ok=True)
-    ok, failed = [], []
-    for p in paths:
+    dirs = tuple(os.path.join(home_dir, *parts) for parts in _TRASH_DIR_LAYOUTS[kind])
+    for d in dirs:
         try:
-            if not p or not os.path.exists(p):
-                failed.append(p)
-                continue
-            dest = _unique_dest_path(trash_dir, os.path.basename(p))
-            shutil.move(p, dest)
-            ok.append(p)
+            os.stat(d)
+        except FileNotFoundError:
+            os.makedirs(d, exist_ok=True)
+    return dirs
+
+
+def _with_trash_dirs(home_dir, kind, setup):
+    """Return `setup(dirs)` for the cached trash dirs of `kind`.
+
+    If setup hits FileNotFoundError (the trash was removed since the dirs
+    were cached), the cache is cleared and setup retried once against freshly
+    created directories.
+    """
+
+    try:
+        return setup(_ensured_trash_dirs(home_dir, kind))
+    except FileNotFoundError:
+        _ensured_trash_dirs.cache_clear()
+        return setup(_ensured_trash_dirs(home_dir, kind))
+
+
+def _lstat_trashable(path):
+    """lstat() `path` once, rejecting anything that isn't a file or symlink."""
+
+    st = os.lstat(path)
+    if not (stat.S_ISREG(st.st_mode) or stat.S_ISLNK(st.st_mode)):
+        raise OSError(errno.EINVAL, "Not a regular file", path)
+    return st
+
+
+def _move_into_trash(src, dest, src_st, trash_dev):
+    """Move `src` over its reserved `dest`, with a plain rename when possible.
+
+    os.replace() is a single atomic directory-entry update that overwrites the
+    placeholder on every platform; shutil.move() (extra stats, copy + unlink)
+    is only needed across filesystems.
+    """
+
+    if src_st.st_dev == trash_dev:
+        try:
+            os.replace(src, dest)
+            return
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+    if stat.S_ISLNK(src_st.st_mode):
+        # shutil.move() recreates symlinks with os.symlink(), which won't
+        # overwrite the placeholder.
+        os.unlink(dest)
+    shutil.move(src, dest)
+
+
+def _trash_many_parallel(paths, worker, max_workers=None):
+    """Run `worker(path)` for every path on a thread pool.
+
+    `worker` raises on failure. Returns (ok, failed) in input order. Moves
+    into the trash are directory-entry updates, so keeping several in flight
+    hides per-call syscall latency.
+    """
+
+    if max_workers is None:
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+    max_workers = max(1, min(max_workers, len(paths)))
+
+    def run(p):
+        try:
+            worker(p)
+            return True
         except Exception:
-            failed.append(p)
+            return False
+
+    if max_workers == 1:
+        results = [run(p) for p in paths]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(run, paths))
+
+    ok, failed = [], []
+    for p, succeeded in zip(paths, results):
+        (ok if succeeded else failed).append(p)
     return ok, failed
 
 
-def _trash_freedesktop(paths, home_dir=None, now=None):
-    home_dir = home_dir or os.path.expanduser("~")
-    trash_root = os.path.join(home_dir, ".local", "share", "Trash")
-    files_dir = os.path.join(trash_root, "files")
-    info_dir = os.path.join(trash_root, "info")
-    os.makedirs(files_dir, exist_ok=True)
-    os.makedirs(info_dir, exist_ok=True)
+def _trash_macos(paths, home_dir=None, now=None):
+    def setup(dirs):
+        (trash_dir,) = dirs
+        return trash_dir, os.stat(trash_dir).st_dev
 
-    now = now or _dt.datetime.now(_dt.timezone.utc)
-    stamp = now.astimezone().strftime("%Y-%m-%dT%H:%M:%S")
+    trash_dir, trash_dev = _with_trash_dirs(home_dir, "macos", setup)
+    taken = _TakenNames(lambda: _existing_names(trash_dir))
+    sep = os.sep
 
-    ok, failed = [], []
-    for p in paths:
+    def trash_one(p):
+        st = _lstat_trashable(p)
+        dest = _unique_dest_path(trash_dir, p.rpartition(sep)[2], taken)
         try:
-            if not p or not os.path.exists(p):
-                failed.append(p)
-                continue
-            base = os.path.basename(p)
-            dest = _unique_dest_path(files_dir, base)
-            shutil.move(p, dest)
-            info_name = os.path.basename(dest) + ".trashinfo"
-            info_path = os.path.join(info_dir, info_name)
-            abs_path = os.path.abspath(p)
-            encoded = urllib.parse.quote(abs_path)
-            with open(info_path, "w", encoding="utf-8") as f:
-                f.write("[Trash Info]\n")
-                f.write(f"Path={encoded}\n")
-                f.write(f"DeletionDate={stamp}\n")
-            ok.append(p)
+            _move_into_trash(p, dest, st, trash_dev)
         except Exception:
-            failed.append(p)
+            _discard_placeholder(dest)
+            raise
+
+    ok, failed = _trash_many_parallel(paths, trash_one)
+    if failed:
+        _ensured_trash_dirs.cache_clear()
     return ok, failed
 
 
+def _trash_freedesktop(paths, home_dir=None, now=None):
+    def setup(dirs):
+        files_dir, info_dir = dirs
+        trash_dev = os.stat(files_dir).st_dev
+        # Open info/ once and create .trashinfo files relative to it, so each
+        # one doesn't re-resolve the whole info/ path.
+        info_dirfd = None
+        if os.open in os.supports_dir_fd:
+            info_dirfd = os.open(info_dir, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+        return files_dir, info_dir, trash_dev, info_dirfd
+
+    files_dir, info_dir, trash_dev, info_dirfd = _with_trash_dirs(
+        home_dir, "freedesktop", setup
+    )
+
+    # Close info/ even if anything below fails.
+    try:
+        def scan_taken():
+            # A name is only free if neither files/ nor info/ has it (orphaned
+            # .trashinfo files would otherwise make the info write fail).
+            names = _existing_names(files_dir)
+            names.update(
+                name[: -len(".trashinfo")]
+                for name in _existing_names(info_dir)
+                if name.endswith(".trashinfo")
+            )
+            return names
+
+        taken = _TakenNames(scan_taken)
+
+        now = now or _dt.datetime.now(_dt.timezone.utc)
+        stamp = now.astimezone().strftime("%Y-%m-%dT%H:%M:%S")
+        # Only Path= differs between the info files of one call.
+        info_prefix = b"[Trash Info]\nPath="
+        info_suffix = b"\nDeletionDate=" + stamp.encode("ascii") + b"\n"
+        info_flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL
+        # Plain string ops on POSIX paths; cheaper than posixpath per file.
+        sep = os.sep
+        info_dir_sep = info_dir + sep
+
+        def trash_one(p):
+            st = _lstat_trashable(p)
+            base = p.rpartition(sep)[2]
+            # Picard passes absolute paths; only resolve others (getcwd() raises
+            # if the working directory has been deleted).
+            if not p.startswith(sep):
+                p_abs = os.path.join(os.getcwd(), p)
+            else:
+                p_abs = p
+            abs_path = os.path.normpath(p_abs)
+            encoded = urllib.parse.quote_from_bytes(os.fsencode(abs_path), safe=b"/")
+            while True:
+                dest = _unique_dest_path(files_dir, base, taken)
+                dest_name = dest.rpartition(sep)[2]
+                info_name = dest_name + ".trashinfo"
+                info_path = info_dir_sep + info_name
+                try:
+                    if info_dirfd is None:
+                        fd = os.open(info_path, info_flags, 0o600)
+                    else:
+                        fd = os.open(info_name, info_flags, 0o600, dir_fd=info_dirfd)
+                except FileExistsError:
+                    # Orphaned .trashinfo; the name is taken after all.
+                    _discard_placeholder(dest)
+                    taken.collided(dest_name)
+                    continue
+                except Exception:
+                    _discard_placeholder(dest)
+                    raise
+                break
+            # The spec has the info file written before the move, so an entry in
+            # files/ always has its metadata.
+            created = [dest, info_path]
+            try:
+                try:
+                    os.write(fd, info_prefix + encoded.encode("ascii") + info_suffix)
+                finally:
+                    os.close(fd)
+                _move_into_trash(p, dest, st, trash_dev)
+            except Exception:
+                for path in created:
+                    _discard_placeholder(path)
+                raise
+
+        ok, failed = _trash_many_parallel(paths, trash_one)
+    finally:
+        if info_dirfd is not None:
+            os.close(info_dirfd)
+    if failed:
+        _ensured_trash_dirs.cache_clear()
+    return ok, failed
+
+
+def _trash_impl_for(platform):
+    if platform.startswith("win"):
+        return _trash_windows
+    if platform == "darwin":
+        return _trash_macos
+    return _trash_freedesktop
+
+
+# The platform can't change within a process, so pick the backend once.
+_PLATFORM_IMPL = _trash_impl_for(sys.platform)
+
+
 def send_paths_to_trash(paths, platform=None, home_dir=None, now=None):
-    platform = platform or sys.platform
-    paths = [str(p) for p in (paths or []) if p]
     if not paths:
         return [], []
-    if platform.startswith("win"):
-        return _trash_windows(paths)
-    if platform == "darwin":
-        return _trash_macos(paths, home_dir=home_dir)
-    return _trash_freedesktop(paths, home_dir=home_dir, now=now)
+    # Picard hands us a list of non-empty str already; only rebuild otherwise.
+    if not (type(paths) is list and all(type(p) is str and p for p in paths)):
+        paths = [str(p) for p in paths if p]
+    if not paths:
+        return [], []
+    impl = _trash_impl_for(platform) if platform else _PLATFORM_IMPL
+    return impl(paths, home_dir, now)
 
 
 def _extract_file_paths(objs):
@@ -183,105 +679,153 @@ def _extract_file_paths(objs):
     File objects via `iterfiles()`.
     """
 
-    _files, paths, _debug = _extract_files_and_paths(objs)
+    _files_by_path, paths, _debug = _extract_files_and_paths(objs)
     return paths
 
 
+def _extract_via_iterfiles(obj, type_name, add_file_candidate, debug_info):
+    # Preferred: objects that can yield linked File objects.
+    iterfiles = getattr(obj, "iterfiles", None)
+    if not callable(iterfiles):
+        return None
+    try:
+        count_added = 0
+        try:
+            iterable = iterfiles()
+        except TypeError:
+            # Some implementations require optional args.
+            iterable = iterfiles(False)
+        if not isinstance(iterable, Iterable):
+            debug_info.append(
+                (type_name, "iterfiles", "not iterable")
+            )
+            return True
+        for f in iterable:
+            count_added += add_file_candidate(f)
+        debug_info.append((type_name, "iterfiles", f"added {count_added} path(s)"))
+        return True
+    except Exception as e:
+        debug_info.append(
+            (type_name, "iterfiles_failed", f"{type(e).__name__}: {e}")
+        )
+        # fall through to other methods
+        return False
+
+
+def _extract_via_filename(obj, type_name, add_file_candidate, debug_info):
+    # Direct file object.
+    if not getattr(obj, "filename", None):
+        return None
+    count_added = add_file_candidate(obj)
+    debug_info.append((type_name, "filename", f"added {count_added} path(s)"))
+    return True
+
+
+def _extract_via_files(obj, type_name, add_file_candidate, debug_info):
+    # Containers sometimes expose linked files as `files`.
+    linked = getattr(obj, "files", None)
+    if not linked:
+        return None
+    try:
+        count_added = 0
+        for f in linked:
+            count_added += add_file_candidate(f)
+        debug_info.append((type_name, "files", f"added {count_added} path(s)"))
+        return True
+    except Exception as e:
+        debug_info.append((type_name, "files_failed", f"{type(e).__name__}: {e}"))
+        return False
+
+
+def _extract_via_file(obj, type_name, add_file_candidate, debug_info):
+    # Some wrappers might hold a single File in `file`.
+    wrapped = getattr(obj, "file", None)
+    if wrapped is None or not getattr(wrapped, "filename", None):
+        return None
+    count_added = add_file_candidate(wrapped)
+    debug_info.append((type_name, "file", f"added {count_added} path(s)"))
+    return True
+
+
+# Tried in order. Each returns True once it has handled the object, False if
+# it applied but failed (falling through to the next), None if it didn't apply.
+# Applicability depends on instance attributes (File.filename), so the order
+# is evaluated per object rather than cached per type: which paths an object
+# yields must not depend on what else is selected.
+_EXTRACTORS = (
+    _extract_via_iterfiles,
+    _extract_via_filename,
+    _extract_via_files,
+    _extract_via_file,
+)
+
+
 def _extract_files_and_paths(objs):
-    """Return (files, paths, debug_info) from Picard selection objects.
+    """Return (files_by_path, paths, debug_info) from Picard selection objects.
 
-    - `files` are Picard File-like objects (must have `.filename`).
-    - `paths` are unique file system paths.
+    - `files_by_path` maps each path to its Picard File-like object (must have
+      `.filename`).
+    - `paths` are unique file system paths, in selection order.
     - `debug_info` is a list of per-object tuples (type_name, outcome, detail).
     """
 
-    seen_paths = set()
-    seen_file_ids = set()
-    files = []
-    paths = []
+    # One insertion-ordered dict gives O(1) dedup and the path -> File mapping.
+    files_by_path: dict[str, object] = {}
     debug_info = []
 
+    def add_file_candidate(f):
+        p = getattr(f, "filename", None)
+        if not p or p in files_by_path:
+            return 0
+        files_by_path[p] = f
+        return 1
+
     for obj in objs or []:
         if obj is None:
             debug_info.append(("<None>", "skip", "None in selection"))
             continue
         type_name = type(obj).__name__
 
-        def add_file_candidate(f):
-            p = getattr(f, "filename", None)
-            if not p:
-                return 0
-            added = 0
-            if p not in seen_paths:
-                seen_paths.add(p)
-                paths.append(p)
-                added = 1
-            fid = id(f)
-            if fid not in seen_file_ids:
-                seen_file_ids.add(fid)
-                files.append(f)
-            return added
-
-        # Preferred: objects that can yield linked File objects.
-        iterfiles = getattr(obj, "iterfiles", None)
-        if callable(iterfiles):
-            try:
-                count_added = 0
-                try:
-                    iterable = iterfiles()
-                except TypeError:
-                    # Some implementations require optional args.
-                    iterable = iterfiles(False)
-                if not isinstance(iterable, Iterable):
-                    debug_info.append(
-                        (type_name, "iterfiles", "not iterable")
-                    )
-                    continue
-                for f in iterable:
-                    count_added += add_file_candidate(f)
-                debug_info.append((type_name, "iterfiles", f"added {count_added} path(s)"))
-                continue
-            except Exception as e:
-                debug_info.append(
-                    (type_name, "iterfiles_failed", f"{type(e).__name__}: {e}")
+        for extractor in _EXTRACTORS:
+            if extractor(obj, type_name, add_file_candidate, debug_info):
+                break
+        else:
+            # Nothing matched.
+            debug_info.append(
+                (
+                    type_name,
+                    "unhandled",
+                    "no iterfiles()/filename/files/file on object",
                 )
-                # fall through to other methods
+            )
 
-        # Direct file object.
-        if getattr(obj, "filename", None):
-            count_added = add_file_candidate(obj)
-            debug_info.append((type_name, "filename", f"added {count_added} path(s)"))
-            continue
+    return files_by_path, list(files_by_path), debug_info
 
-        # Containers sometimes expose linked files as `files`.
-        linked = getattr(obj, "files", None)
-        if linked:
-            try:
-                count_added = 0
-                for f in linked:
-                    count_added += add_file_candidate(f)
-                debug_info.append((type_name, "files", f"added {count_added} path(s)"))
-                continue
-            except Exception as e:
-                debug_info.append((type_name, "files_failed", f"{type(e).__name__}: {e}"))
-
-        # Some wrappers might hold a single File in `file`.
-        wrapped = getattr(obj, "file", None)
-        if wrapped is not None and getattr(wrapped, "filename", None):
-            count_added = add_file_candidate(wrapped)
-            debug_info.append((type_name, "file", f"added {count_added} path(s)"))
-            continue
 
-        # Nothing matched.
-        debug_info.append(
-            (
-                type_name,
-                "unhandled",
-                "no iterfiles()/filename/files/file on object",
-            )
-        )
+class _TrashTaskSignals(QObject):
+    # (ok, failed, error): error is a formatted traceback, or None.
+    finished = pyqtSignal(object, object, object)
+
+
+class _TrashTask(QRunnable):
+    """Runs send_paths_to_trash() off the UI thread."""
 
-    return files, paths, debug_info
+    def __init__(self, paths):
+        super().__init__()
+        self.paths = paths
+        self.signals = _TrashTaskSignals()
+
+    def run(self):
+        try:
+            ok, failed = send_paths_to_trash(self.paths)
+            error = None
+        except Exception:
+            ok, failed, error = [], list(self.paths), traceback.format_exc()
+        self.signals.finished.emit(ok, failed, error)
+
+
+# Keeps each task's signal emitter alive until its result has been delivered.
+_PENDING_TRASH_SIGNALS = set()
 
 
 class SendToRecycleBinAction(BaseAction):
@@ -292,7 +836,7 @@ class SendToRecycleBinAction(BaseAction):
     NAME = "Send to Recycle Bin"
 
     def callback(self, objs):
-        files, paths, debug_info = _extract_files_and_paths(objs)
+        files_by_path, paths, debug_info = _extract_files_and_paths(objs)
         if not paths:
             # Make it easy to diagnose why the action can't run for a selection.
             try:
@@ -314,7 +858,22 @@ class SendToRecycleBinAction(BaseAction):
             self.api.logger.debug("Recycle Bin: user cancelled")
             return
 
-        ok, failed = send_paths_to_trash(paths)
+        # Trashing thousands of files takes a while; keep the UI responsive and
+        # finish up (logging, UI removal) back on the UI thread.
+        task = _TrashTask(paths)
+        signals = task.signals
+        _PENDING_TRASH_SIGNALS.add(signals)
+
+        def finished(ok, failed, error):
+            _PENDING_TRASH_SIGNALS.discard(signals)
+            self._on_trashed(files_by_path, ok, failed, error)
+
+        signals.finished.connect(finished, Qt.ConnectionType.QueuedConnection)
+        QThreadPool.globalInstance().start(task)
+
+    def _on_trashed(self, files_by_path, ok, failed, error):
+        if error:
+            self.api.logger.error("Recycle Bin: trashing failed unexpectedly:\n%s", error)
         self.api.logger.info("Recycle Bin: sent %d file(s) to trash", len(ok))
         if failed:
             self.api.logger.error("Recycle Bin: failed to trash %d file(s)", len(failed))
@@ -322,12 +881,11 @@ class SendToRecycleBinAction(BaseAction):
 
         # Best-effort: remove files from Picard UI.
         # This should never be silent: if we can't remove, we log why.
-        ok_set = set(ok)
-        files_to_remove = [f for f in files if getattr(f, "filename", None) in ok_set]
-        if ok_set and not files_to_remove:
+        files_to_remove = [files_by_path[p] for p in ok if p in files_by_path]
+        if ok and not files_to_remove:
             self.api.logger.debug(
                 "Recycle Bin: trashed files but couldn't map them back to File objects for UI removal (ok=%r)",
-                sorted(ok_set),
+                sorted(ok),
             )
         elif files_to_remove:
             tagger = getattr(self, "tagger", None)
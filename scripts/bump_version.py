@@ -11,6 +11,10 @@ Optionally:
 - pushes commit + tag
 
 Designed for plugin maintainers working in a git clone.
+
+If pygit2 is installed, the worktree check runs in-process against libgit2.
+Commit, tag and push always use the git CLI, so hooks (pre-commit),
+commit.gpgsign / tag.gpgSign and credential helpers apply as usual.
 """
 
 from __future__ import annotations
@@ -21,34 +25,73 @@ import subprocess
 import sys
 from pathlib import Path
 
+try:
+    import pygit2
+except ImportError:  # optional; fall back to the git CLI
+    pygit2 = None
+
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 MANIFEST_PATH = REPO_ROOT / "MANIFEST.toml"
 README_PATH = REPO_ROOT / "README.md"
 
 
-_VERSION_RE = re.compile(r'^(?P<key>version)\s*=\s*"(?P<version>[^"]+)"\s*$', re.MULTILINE)
-_README_VERSION_RE = re.compile(r'^(?P<prefix>-\s+Plugin version:)\s*(?P<version>\S+)\s*$', re.MULTILINE)
 _SEMVER_RE = re.compile(r"^(0|[1-9]\d*)\.(0|[1-9]\d*)\.(0|[1-9]\d*)$")
 
 
-def _run(cmd: list[str], *, cwd: Path = REPO_ROOT) -> str:
+def _run(cmd: list[str], *, cwd: Path = REPO_ROOT, capture: bool = True) -> str:
+    """Run `cmd`, raising on failure; returns stripped stdout if `capture`.
+
+    With `capture=False` stdout is discarded instead of piped (stderr is still
+    kept for the error message) and "" is returned.
+    """
+
     proc = subprocess.run(
         cmd,
         cwd=str(cwd),
         text=True,
-        capture_output=True,
+        stdout=subprocess.PIPE if capture else subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
         check=False,
     )
     if proc.returncode != 0:
         raise RuntimeError(
-            f"Command failed ({proc.returncode}): {' '.join(cmd)}\n{proc.stdout}{proc.stderr}"
+            f"Command failed ({proc.returncode}): {' '.join(cmd)}\n{proc.stdout or ''}{proc.stderr}"
         )
-    return proc.stdout.strip()
-
-
-def _require_clean_worktree() -> None:
-    out = _run(["git", "status", "--porcelain=v1"])  # empty when clean
+    return proc.stdout.strip() if capture else ""
+
+
+def _open_repo():
+    if pygit2 is None:
+        return None
+    return pygit2.Repository(str(REPO_ROOT))
+
+
+def _require_clean_worktree(repo=None) -> None:
+    if repo is not None:
+        assert pygit2 is not None  # only _open_repo() hands out a repo
+        # Same rule as the CLI path: untracked and ignored files don't count.
+        ignored = pygit2.GIT_STATUS_WT_NEW | pygit2.GIT_STATUS_IGNORED
+        dirty = sorted(path for path, flags in repo.status().items() if flags & ~ignored)
+        if dirty:
+            raise RuntimeError(
+                "Working tree is not clean. Commit/stash changes before bumping.\n"
+                + "\n".join(dirty)
+            )
+        return
+
+    # Fast path: exit status only, nothing captured or formatted. Untracked
+    # files don't count; the bump commit only ever includes its own files.
+    proc = subprocess.run(
+        ["git", "diff-index", "--quiet", "HEAD", "--"],
+        cwd=str(REPO_ROOT),
+        check=False,
+    )
+    if proc.returncode == 0:
+        return
+    # diff-index also trips on files that were only touched (stale stat
+    # info), so let status decide and describe what's actually changed.
+    out = _run(["git", "status", "--porcelain=v1", "--untracked-files=no"])  # empty when clean
     if out:
         raise RuntimeError(
             "Working tree is not clean. Commit/stash changes before bumping.\n"
@@ -56,11 +99,34 @@ def _require_clean_worktree() -> None:
         )
 
 
+def _find_manifest_version(text: str) -> tuple[int, int, str]:
+    """Locate the top-level `version = "X.Y.Z"` line in MANIFEST.toml.
+
+    Scans lines only up to the first [table] header, so a `version` key inside
+    a table never matches. Returns (start, end, version), where start/end are
+    the offsets of the line without its line break.
+    """
+
+    pos = 0
+    for line in text.splitlines(keepends=True):
+        if line.lstrip().startswith("["):
+            break
+        key, sep, value = line.partition("=")
+        value = value.strip()
+        if (
+            sep
+            and key.rstrip() == "version"
+            and len(value) > 2
+            and value[0] == value[-1] == '"'
+            and '"' not in value[1:-1]
+        ):
+            return pos, pos + len(line.rstrip("\r\n")), value[1:-1]
+        pos += len(line)
+    raise RuntimeError("Could not find version in MANIFEST.toml")
+
+
 def _parse_manifest_version(text: str) -> str:
-    m = _VERSION_RE.search(text)
-    if not m:
-        raise RuntimeError("Could not find version in MANIFEST.toml")
-    return m.group("version")
+    return _find_manifest_version(text)[2]
 
 
 def _bump_semver(version: str, bump: str) -> str:
@@ -84,37 +150,68 @@ def _bump_semver(version: str, bump: str) -> str:
     return f"{major}.{minor}.{patch}"
 
 
-def _replace_once(pattern: re.Pattern[str], text: str, repl: str, *, what: str) -> str:
-    new_text, count = pattern.subn(repl, text, count=1)
-    if count != 1:
-        raise RuntimeError(f"Expected to update 1 occurrence for {what}, updated {count}")
-    return new_text
+def _compute_new_texts(
+    current: str, new_version: str, manifest_text: str, readme_text: str
+) -> tuple[str, str]:
+    start, end, _version = _find_manifest_version(manifest_text)
+    manifest_text = f'{manifest_text[:start]}version = "{new_version}"{manifest_text[end:]}'
+
+    # A fixed literal line, matched whole; no regex needed. Compared without
+    # the line break, since the last line of the file may not have one.
+    old_line = f"- Plugin version: {current}"
+    new_line = f"- Plugin version: {new_version}"
+    lines = readme_text.splitlines(keepends=True)
+    found = [i for i, line in enumerate(lines) if line.rstrip("\r\n") == old_line]
+    if not found and sum(line.rstrip("\r\n") == new_line for line in lines) == 1:
+        # Already bumped (re-run after a partial bump); leave it unchanged.
+        return manifest_text, readme_text
+    if len(found) != 1:
+        raise RuntimeError(
+            f"Expected 1 {old_line!r} line in README.md, found {len(found)}"
+        )
+    i = found[0]
+    lines[i] = new_line + lines[i][len(old_line):]
+    readme_text = "".join(lines)
 
+    return manifest_text, readme_text
 
-def bump_version(new_version: str) -> None:
-    manifest_text = MANIFEST_PATH.read_text(encoding="utf-8")
-    readme_text = README_PATH.read_text(encoding="utf-8")
 
-    current = _parse_manifest_version(manifest_text)
+def bump_version(
+    new_version: str, current: str, manifest_text: str, readme_text: str
+) -> list[Path]:
+    """Write the new version into MANIFEST.toml and README.md.
+
+    Takes the current version and file contents the caller already read.
+    Returns the files that actually changed; unchanged files aren't rewritten.
+    """
+
     if current == new_version:
         raise RuntimeError(f"Version is already {new_version}")
 
-    manifest_text = _replace_once(
-        _VERSION_RE,
-        manifest_text,
-        f'version = "{new_version}"',
-        what="MANIFEST.toml version",
+    new_manifest, new_readme = _compute_new_texts(
+        current, new_version, manifest_text, readme_text
     )
 
-    readme_text = _replace_once(
-        _README_VERSION_RE,
-        readme_text,
-        f"- Plugin version: {new_version}",
-        what="README.md plugin version",
+    changed = []
+    if new_manifest != manifest_text:
+        MANIFEST_PATH.write_text(new_manifest, encoding="utf-8")
+        changed.append(MANIFEST_PATH)
+    if new_readme != readme_text:
+        README_PATH.write_text(new_readme, encoding="utf-8")
+        changed.append(README_PATH)
+    return changed
+
+
+def _git_commit(paths: list[Path], message: str) -> None:
+    # --only stages and commits just these paths in one git process.
+    _run(
+        ["git", "commit", "--only", "-m", message, "--", *map(str, paths)],
+        capture=False,
     )
 
-    MANIFEST_PATH.write_text(manifest_text, encoding="utf-8")
-    README_PATH.write_text(readme_text, encoding="utf-8")
+
+def _git_tag(tag_name: str) -> None:
+    _run(["git", "tag", "-a", tag_name, "-m", tag_name], capture=False)
 
 
 def main(argv: list[str]) -> int:
@@ -161,14 +258,16 @@ def main(argv: list[str]) -> int:
     parser.add_argument(
         "--branch",
         default=None,
-        help="Branch to push (default: current branch)",
+        help="Remote branch to push HEAD to (default: the current branch's name)",
     )
 
     args = parser.parse_args(argv)
 
-    _require_clean_worktree()
+    repo = _open_repo()
+    _require_clean_worktree(repo)
 
     manifest_text = MANIFEST_PATH.read_text(encoding="utf-8")
+    readme_text = README_PATH.read_text(encoding="utf-8")
     current = _parse_manifest_version(manifest_text)
 
     if args.new_version:
@@ -178,25 +277,25 @@ def main(argv: list[str]) -> int:
     else:
         new_version = _bump_semver(current, args.bump)
 
-    bump_version(new_version)
+    changed = bump_version(new_version, current, manifest_text, readme_text)
 
     commit_msg = args.message or f"Bump version to {new_version}"
     tag_name = f"{args.tag_prefix}{new_version}"
 
-    if not args.no_commit:
-        _run(["git", "add", str(MANIFEST_PATH), str(README_PATH)])
-        _run(["git", "commit", "-m", commit_msg])
+    if not args.no_commit and changed:
+        _git_commit(changed, commit_msg)
 
     if not args.no_tag:
-        _run(["git", "tag", "-a", tag_name, "-m", tag_name])
+        _git_tag(tag_name)
 
     if not args.no_push:
-        branch = args.branch or _run(["git", "branch", "--show-current"])
-        if not branch:
-            raise RuntimeError("Could not determine current branch; pass --branch")
-        _run(["git", "push", args.remote, branch])
+        # Push the branch and tag together, atomically. Without --branch,
+        # "HEAD" pushes the current branch to its namesake on the remote.
+        refspec = f"HEAD:refs/heads/{args.branch}" if args.branch else "HEAD"
+        push_cmd = ["git", "push", "--atomic", args.remote, refspec]
         if not args.no_tag:
-            _run(["git", "push", args.remote, tag_name])
+            push_cmd.append(tag_name)
+        _run(push_cmd, capture=False)
 
     print(f"Updated version: {current} -> {new_version}")
     if not args.no_tag:
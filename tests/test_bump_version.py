@@ -0,0 +1,124 @@
+"""Unit tests for scripts/bump_version.py's file rewriting.
+
+Run from the repository root:
+
+    python -m unittest discover -s tests
+"""
+
+import importlib.util
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _load_script():
+    spec = importlib.util.spec_from_file_location(
+        "bump_version", REPO_ROOT / "scripts" / "bump_version.py"
+    )
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+bump = _load_script()
+
+MANIFEST = 'name = "Recycle Bin"\nversion = "1.2.3"\n'
+README = "# Recycle Bin\n\n- Plugin version: 1.2.3\n- API: 3.0\n"
+
+
+class FindManifestVersionTest(unittest.TestCase):
+    def test_top_level_key(self):
+        text = 'name = "x"\nversion = "1.2.3"\n'
+        start, end, version = bump._find_manifest_version(text)
+        self.assertEqual(version, "1.2.3")
+        self.assertEqual(text[start:end], 'version = "1.2.3"')
+
+    def test_without_spaces(self):
+        self.assertEqual(bump._parse_manifest_version('version="0.1.0"\n'), "0.1.0")
+
+    def test_crlf_line_end_not_included(self):
+        text = 'version = "1.0.0"\r\nname = "x"\r\n'
+        start, end, _version = bump._find_manifest_version(text)
+        self.assertEqual(text[start:end], 'version = "1.0.0"')
+
+    def test_stops_at_table_header(self):
+        text = 'name = "x"\nversion = "1.0.0"\n\n[source]\nversion = "9.9.9"\n'
+        self.assertEqual(bump._parse_manifest_version(text), "1.0.0")
+
+    def test_version_only_inside_table_is_not_found(self):
+        text = 'name = "x"\n\n[source]\nversion = "9.9.9"\n'
+        with self.assertRaisesRegex(RuntimeError, "Could not find version"):
+            bump._find_manifest_version(text)
+
+    def test_ignores_similar_keys(self):
+        text = 'api_version = "3.0"\nversions = "2"\nversion = "1.0.0"\n'
+        self.assertEqual(bump._parse_manifest_version(text), "1.0.0")
+
+
+class ComputeNewTextsTest(unittest.TestCase):
+    def readme(self, readme_text):
+        return bump._compute_new_texts("1.2.3", "1.2.4", MANIFEST, readme_text)[1]
+
+    def test_readme_line_without_trailing_newline(self):
+        self.assertEqual(
+            self.readme("# Recycle Bin\n- Plugin version: 1.2.3"),
+            "# Recycle Bin\n- Plugin version: 1.2.4",
+        )
+
+    def test_readme_line_must_match_whole(self):
+        with self.assertRaisesRegex(RuntimeError, "found 0"):
+            self.readme("- Plugin version: 1.2.34\n")
+
+    def test_readme_line_must_be_unique(self):
+        with self.assertRaisesRegex(RuntimeError, "found 2"):
+            self.readme("- Plugin version: 1.2.3\n- Plugin version: 1.2.3\n")
+
+
+class BumpVersionTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        root = Path(tmp.name)
+        self.manifest = root / "MANIFEST.toml"
+        self.readme = root / "README.md"
+        for name, path in (("MANIFEST_PATH", self.manifest), ("README_PATH", self.readme)):
+            patcher = mock.patch.object(bump, name, path)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_bump(self, manifest_text, readme_text, new_version="1.2.4"):
+        self.manifest.write_text(manifest_text, encoding="utf-8")
+        self.readme.write_text(readme_text, encoding="utf-8")
+        current = bump._parse_manifest_version(manifest_text)
+        return bump.bump_version(new_version, current, manifest_text, readme_text)
+
+    def test_updates_both_files(self):
+        changed = self.run_bump(MANIFEST, README)
+        self.assertEqual(changed, [self.manifest, self.readme])
+        self.assertEqual(
+            self.manifest.read_text(encoding="utf-8"),
+            'name = "Recycle Bin"\nversion = "1.2.4"\n',
+        )
+        self.assertIn("- Plugin version: 1.2.4\n", self.readme.read_text(encoding="utf-8"))
+
+    def test_readme_already_bumped_is_left_alone(self):
+        readme = README.replace("1.2.3", "1.2.4")
+        changed = self.run_bump(MANIFEST, readme)
+        self.assertEqual(changed, [self.manifest])
+        self.assertEqual(self.readme.read_text(encoding="utf-8"), readme)
+
+    def test_missing_readme_line_fails(self):
+        with self.assertRaisesRegex(RuntimeError, "found 0"):
+            self.run_bump(MANIFEST, "# Recycle Bin\n")
+
+    def test_same_version_fails(self):
+        with self.assertRaisesRegex(RuntimeError, "already 1.2.3"):
+            self.run_bump(MANIFEST, README, new_version="1.2.3")
+
+
+if __name__ == "__main__":
+    unittest.main()
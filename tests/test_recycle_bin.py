@@ -0,0 +1,239 @@
+"""Unit tests for the Recycle Bin plugin's path handling.
+
+Run from the repository root with Picard on PYTHONPATH (see AGENTS.md):
+
+    python -m unittest discover -s tests
+"""
+
+import datetime
+import errno
+import importlib.util
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _load_plugin():
+    spec = importlib.util.spec_from_file_location("recycle_bin", REPO_ROOT / "__init__.py")
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+recycle_bin = _load_plugin()
+
+
+class _TrashTestCase(unittest.TestCase):
+    platform = ""
+    trash_parts: tuple[str, ...] = ()
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        self.home = os.path.join(self.root, "home")
+        os.mkdir(self.home)
+        self.trash = os.path.join(self.home, *self.trash_parts)
+
+    def make_file(self, *parts, content=""):
+        path = os.path.join(self.root, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def trash_paths(self, paths, now=None):
+        return recycle_bin.send_paths_to_trash(
+            paths, platform=self.platform, home_dir=self.home, now=now
+        )
+
+    def files_dir(self):
+        return self.trash
+
+
+class MacosTrashTest(_TrashTestCase):
+    platform = "darwin"
+    trash_parts = (".Trash",)
+
+    def test_moves_file_into_trash(self):
+        path = self.make_file("a.mp3", content="x")
+        self.assertEqual(self.trash_paths([path]), ([path], []))
+        self.assertFalse(os.path.exists(path))
+        with open(os.path.join(self.files_dir(), "a.mp3"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "x")
+
+    def test_colliding_names_get_a_counter(self):
+        paths = [self.make_file(d, "a.mp3", content=d) for d in ("x", "y", "z")]
+        self.trash_paths(paths[:1])
+        self.trash_paths(paths[1:])
+        self.assertEqual(
+            sorted(os.listdir(self.files_dir())), ["a.1.mp3", "a.2.mp3", "a.mp3"]
+        )
+        with open(os.path.join(self.files_dir(), "a.mp3"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "x")
+
+    def test_collision_without_trash_listing_access(self):
+        paths = [self.make_file(d, "a.mp3", content=d) for d in ("x", "y")]
+        self.trash_paths(paths[:1])
+        with mock.patch.object(os, "scandir", side_effect=PermissionError(errno.EPERM, "denied")):
+            self.assertEqual(self.trash_paths(paths[1:]), (paths[1:], []))
+        self.assertEqual(sorted(os.listdir(self.files_dir())), ["a.1.mp3", "a.mp3"])
+
+    def test_failed_move_discards_placeholder(self):
+        path = self.make_file("a.mp3")
+        with mock.patch.object(
+            recycle_bin, "_move_into_trash", side_effect=OSError(errno.EACCES, "denied")
+        ):
+            self.assertEqual(self.trash_paths([path]), ([], [path]))
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(os.listdir(self.files_dir()), [])
+
+    def test_missing_and_directory_paths_fail(self):
+        directory = os.path.join(self.root, "album")
+        os.mkdir(directory)
+        missing = os.path.join(self.root, "missing.mp3")
+        self.assertEqual(self.trash_paths([directory, missing]), ([], [directory, missing]))
+        self.assertTrue(os.path.isdir(directory))
+
+    def test_recreates_trash_removed_after_a_call(self):
+        first = self.make_file("a.mp3")
+        self.trash_paths([first])
+        shutil.rmtree(self.trash)
+        second = self.make_file("b.mp3")
+        self.assertEqual(self.trash_paths([second]), ([second], []))
+        self.assertEqual(os.listdir(self.files_dir()), ["b.mp3"])
+
+    def test_symlink_moved_across_devices(self):
+        link = os.path.join(self.root, "link.mp3")
+        os.symlink("target.mp3", link)
+
+        def exdev(*_args, **_kwargs):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+        with mock.patch.object(os, "replace", exdev), mock.patch.object(os, "rename", exdev):
+            self.assertEqual(self.trash_paths([link]), ([link], []))
+        moved = os.path.join(self.files_dir(), "link.mp3")
+        self.assertEqual(os.readlink(moved), "target.mp3")
+        self.assertFalse(os.path.lexists(link))
+
+
+class FreedesktopTrashTest(MacosTrashTest):
+    platform = "linux"
+    trash_parts = (".local", "share", "Trash")
+
+    def files_dir(self):
+        return os.path.join(self.trash, "files")
+
+    def info_dir(self):
+        return os.path.join(self.trash, "info")
+
+    def test_writes_trashinfo(self):
+        path = self.make_file("my music", "a%b.mp3")
+        now = datetime.datetime(2024, 1, 2, 3, 4, 5)
+        self.trash_paths([path], now=now)
+        self.assertEqual(os.listdir(self.files_dir()), ["a%b.mp3"])
+        with open(os.path.join(self.info_dir(), "a%b.mp3.trashinfo"), "rb") as f:
+            info = f.read()
+        quoted = os.path.join(self.root, "my%20music", "a%25b.mp3").encode()
+        self.assertEqual(
+            info,
+            b"[Trash Info]\nPath=" + quoted + b"\nDeletionDate=2024-01-02T03:04:05\n",
+        )
+
+    def test_skips_names_with_orphaned_trashinfo(self):
+        os.makedirs(self.info_dir())
+        orphan = os.path.join(self.info_dir(), "a.mp3.trashinfo")
+        open(orphan, "wb").close()
+        path = self.make_file("a.mp3")
+        self.assertEqual(self.trash_paths([path]), ([path], []))
+        self.assertEqual(os.listdir(self.files_dir()), ["a.1.mp3"])
+        self.assertEqual(os.path.getsize(orphan), 0)
+
+    def test_absolute_paths_ignore_deleted_cwd(self):
+        path = self.make_file("a.mp3")
+        with mock.patch.object(os, "getcwd", side_effect=FileNotFoundError(errno.ENOENT, "gone")):
+            self.assertEqual(self.trash_paths([path]), ([path], []))
+
+    def test_closes_info_dir_when_a_later_step_fails(self):
+        self.trash_paths([self.make_file("a.mp3")])
+        with mock.patch.object(os, "close", wraps=os.close) as close, mock.patch.object(
+            recycle_bin, "_TakenNames", side_effect=RuntimeError("boom")
+        ):
+            with self.assertRaises(RuntimeError):
+                self.trash_paths([self.make_file("b.mp3")])
+        if os.open in os.supports_dir_fd:
+            close.assert_called_once()
+
+    def test_failed_move_discards_placeholder(self):
+        super().test_failed_move_discards_placeholder()
+        self.assertEqual(os.listdir(self.info_dir()), [])
+
+
+class PlatformSelectionTest(unittest.TestCase):
+    def test_backend_per_platform(self):
+        self.assertIs(recycle_bin._trash_impl_for("win32"), recycle_bin._trash_windows)
+        self.assertIs(recycle_bin._trash_impl_for("darwin"), recycle_bin._trash_macos)
+        self.assertIs(recycle_bin._trash_impl_for("linux"), recycle_bin._trash_freedesktop)
+        self.assertIs(recycle_bin._trash_impl_for("freebsd13"), recycle_bin._trash_freedesktop)
+
+    def test_empty_input(self):
+        self.assertEqual(recycle_bin.send_paths_to_trash([]), ([], []))
+        self.assertEqual(recycle_bin.send_paths_to_trash(["", None]), ([], []))
+
+
+class _FakeFile:
+    def __init__(self, filename):
+        self.filename = filename
+
+
+class _Track:
+    """Exposes both iterfiles() and a filename, like some Picard wrappers."""
+
+    def __init__(self, filename, files=None):
+        self.filename = filename
+        self._files = files
+
+    def iterfiles(self):
+        if self._files is None:
+            raise RuntimeError("no linked files")
+        return iter(self._files)
+
+
+class _Wrapper:
+    """Has both a filename and linked files; filename takes priority."""
+
+    def __init__(self, filename, files):
+        self.filename = filename
+        self.files = files
+
+
+class ExtractFilesTest(unittest.TestCase):
+    def paths(self, objs):
+        _files_by_path, paths, _debug = recycle_bin._extract_files_and_paths(objs)
+        return paths
+
+    def test_files_and_dedup(self):
+        a = _FakeFile("/a.mp3")
+        self.assertEqual(self.paths([a, None, a, _FakeFile("/b.mp3")]), ["/a.mp3", "/b.mp3"])
+
+    def test_falls_back_when_iterfiles_fails(self):
+        ok = _Track("/track", [_FakeFile("/a.mp3")])
+        broken = _Track("/b.mp3")
+        self.assertEqual(self.paths([ok, broken]), ["/a.mp3", "/b.mp3"])
+        self.assertEqual(self.paths([broken, ok]), ["/b.mp3", "/a.mp3"])
+
+    def test_result_does_not_depend_on_earlier_objects(self):
+        first = _Wrapper(None, [_FakeFile("/x.mp3")])
+        second = _Wrapper("/self.mp3", [_FakeFile("/y.mp3")])
+        self.assertEqual(self.paths([second]), ["/self.mp3"])
+        self.assertEqual(self.paths([first, second]), ["/x.mp3", "/self.mp3"])
+
+
+if __name__ == "__main__":
+    unittest.main()